@@ -1,28 +1,189 @@
 #!/usr/bin/env python3
+import email.utils
+import functools
+import gzip
 import json
 import mimetypes
 import os
 import re
+import stat
 import subprocess
+import threading
+import time
 import urllib.parse
-from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson:
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 PUBLIC_DIR = os.path.join(HERE, "public")
-UNIT_RE = re.compile(r"^[A-Za-z0-9:._@\-]+$")
-INVOCATION_RE = re.compile(r"^[0-9a-f]{32}$")
+UNIT_RE = re.compile(r"\A[A-Za-z0-9:._@\-]{1,200}\Z")
+INVOCATION_RE = re.compile(r"\A[0-9a-f]{32}\Z")
+JOURNAL_INVOCATION_RE = re.compile(rb'"INVOCATION_ID"\s*:\s*"([0-9a-f]{32})"')
+JOURNAL_CURSOR_RE = re.compile(rb'"__CURSOR"\s*:\s*"([^"]+)"')
+STATUS_RE = re.compile(
+    r"(?P<failed>failed|error|exited)|(?P<success>deactivated successfully|^finished )",
+    re.I | re.A,
+)
+UNIT_FILE_LINE_RE = re.compile(r"^[ \t]*(\S+)[ \t]+(\S+)[^\n]*$", re.M)
+UNIT_LINE_RE = re.compile(
+    r"^[ \t●○*]*(\S+)[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)(?:[ \t]+([^\n]*?))?[ \t]*$",
+    re.M,
+)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+TIMERS_INDEX = {}
+TIMERS_INDEX_LOCK = threading.Lock()
+RUNS_KEEP = 50
+RUNS_CACHE_UNITS = 256
+RUNS_CACHE = OrderedDict()
+RUNS_CACHE_LOCK = threading.Lock()
+GZIP_MIN_BYTES = 1024
+STATIC_CACHE_MAX_BYTES = 1 << 20
+STATIC_CACHE = {}
+STATIC_CACHE_LOCK = threading.Lock()
+SUBPROCESS_SLOTS = threading.BoundedSemaphore(16)
 
 
 def run(cmd, timeout=4):
-    p = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    with SUBPROCESS_SLOTS:
+        p = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
     if p.returncode != 0:
         msg = (p.stderr or p.stdout or "").strip()
         raise RuntimeError(msg or f"command failed: {' '.join(cmd)}")
     return p.stdout
 
 
+def run_records(cmd, timeout=4, sep=b"\x1e", chunk_size=1 << 16):
+    SUBPROCESS_SLOTS.acquire()
+    try:
+        yield from _run_records(cmd, timeout, sep, chunk_size)
+    finally:
+        SUBPROCESS_SLOTS.release()
+
+
+def _run_records(cmd, timeout, sep, chunk_size):
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    expired = []
+    errs = []
+
+    def expire():
+        expired.append(True)
+        p.kill()
+
+    reader = threading.Thread(target=lambda: errs.append(p.stderr.read()), daemon=True)
+    reader.start()
+    timer = threading.Timer(timeout, expire)
+    timer.start()
+    try:
+        buf = bytearray()
+        while True:
+            chunk = p.stdout.read1(chunk_size)
+            if not chunk:
+                break
+            i = chunk.rfind(sep)
+            if i < 0:
+                buf += chunk
+                continue
+            buf += chunk[:i]
+            for rec in bytes(buf).split(sep):
+                if rec:
+                    yield rec
+            buf = bytearray(chunk[i + 1:])
+        if buf:
+            yield bytes(buf)
+        p.wait()
+    finally:
+        timer.cancel()
+        if p.poll() is None:
+            p.kill()
+            p.wait()
+        reader.join()
+        p.stdout.close()
+        p.stderr.close()
+
+    if expired:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if p.returncode != 0:
+        msg = b"".join(errs).decode("utf-8", "replace").strip()
+        raise RuntimeError(msg or f"command failed: {' '.join(cmd)}")
+
+
+class _TTLCache:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.key_locks = {}
+
+    def lookup(self, key):
+        hit = self.entries.get(key)
+        if hit is None or hit[0] <= time.monotonic():
+            return False, None
+        return True, hit[1]
+
+    def get_or_call(self, key, fn):
+        with self.lock:
+            found, value = self.lookup(key)
+            if found:
+                return value
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self.lock:
+                found, value = self.lookup(key)
+            if found:
+                return value
+            value = fn()
+            with self.lock:
+                self.entries[key] = (time.monotonic() + self.seconds, value)
+            return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def ttl_cache(seconds=3):
+    def decorator(fn):
+        cache = _TTLCache(seconds)
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return cache.get_or_call(args, lambda: fn(*args))
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=64)
+def content_type_for(ext):
+    ctype, _ = mimetypes.guess_type("x" + ext)
+    return ctype or "application/octet-stream"
+
+
+def validate_unit(unit):
+    if not UNIT_RE.match(unit):
+        raise ValueError("invalid unit")
+
+
 def usec_to_ms(v):
     try:
         n = int(v)
@@ -41,70 +202,53 @@ def ms_to_iso(ms):
 
 def parse_unit_files(text):
     out = {}
-    for line in text.splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        parts = s.split(None, 1)
-        if len(parts) != 2:
-            continue
-        unit, state = parts
+    for m in UNIT_FILE_LINE_RE.finditer(text):
+        unit, state = m.groups()
         out[unit] = {"unit": unit, "unitFileState": state}
     return out
 
 
 def parse_units(text):
     out = {}
-    for line in text.splitlines():
-        s = line.strip()
-        if not s:
-            continue
-        parts = s.split(None, 4)
-        if len(parts) < 4:
-            continue
-        unit, load, active, sub = parts[0], parts[1], parts[2], parts[3]
-        desc = parts[4] if len(parts) == 5 else ""
+    for m in UNIT_LINE_RE.finditer(text):
+        unit, load, active, sub, desc = m.groups()
         out[unit] = {
             "unit": unit,
             "loadState": load,
             "activeState": active,
             "subState": sub,
-            "description": desc,
+            "description": desc or "",
         }
     return out
 
 
+@ttl_cache(seconds=3)
 def list_units():
-    unit_files = run([
-        "systemctl",
-        "list-unit-files",
-        "--no-pager",
-        "--no-legend",
-    ], timeout=8)
-    units = run([
-        "systemctl",
-        "list-units",
-        "--all",
-        "--no-pager",
-        "--no-legend",
-    ], timeout=8)
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        unit_files = ex.submit(run, [
+            "systemctl",
+            "list-unit-files",
+            "--no-pager",
+            "--no-legend",
+        ], timeout=8)
+        units = ex.submit(run, [
+            "systemctl",
+            "list-units",
+            "--all",
+            "--no-pager",
+            "--no-legend",
+        ], timeout=8)
+        unit_files = unit_files.result()
+        units = units.result()
 
-    a = parse_unit_files(unit_files)
-    b = parse_units(units)
-    merged = {}
-    for unit in set(a.keys()) | set(b.keys()):
-        item = {"unit": unit}
-        if unit in a:
-            item.update(a[unit])
-        if unit in b:
-            item.update(b[unit])
-        merged[unit] = item
+    merged = parse_unit_files(unit_files)
+    for unit, item in parse_units(units).items():
+        merged.setdefault(unit, {"unit": unit}).update(item)
 
-    items = list(merged.values())
-    items.sort(key=lambda x: x.get("unit", ""))
-    return items
+    return sorted(merged.values(), key=itemgetter("unit"))
 
 
+@ttl_cache(seconds=3)
 def list_targets():
     targets = run([
         "systemctl",
@@ -114,11 +258,10 @@ def list_targets():
         "--no-pager",
         "--no-legend",
     ], timeout=8)
-    items = list(parse_units(targets).values())
-    items.sort(key=lambda x: x.get("unit", ""))
-    return items
+    return sorted(parse_units(targets).values(), key=itemgetter("unit"))
 
 
+@ttl_cache(seconds=3)
 def list_timers():
     out = run([
         "systemctl",
@@ -127,7 +270,7 @@ def list_timers():
         "--no-pager",
         "--output=json",
     ], timeout=8)
-    items = json.loads(out or "[]")
+    items = json_loads(out or "[]")
     res = []
     for it in items:
         next_ms = usec_to_ms(it.get("next"))
@@ -144,12 +287,33 @@ def list_timers():
     return res
 
 
+def _timers_index():
+    timers = list_timers()
+    with TIMERS_INDEX_LOCK:
+        if TIMERS_INDEX.get("source") is timers:
+            return TIMERS_INDEX["index"]
+
+    by_timer = {}
+    by_activates = {}
+    for t in timers:
+        if t.get("timer"):
+            by_timer[t["timer"]] = t
+        if t.get("activates"):
+            by_activates.setdefault(t["activates"], []).append(t)
+    for candidates in by_activates.values():
+        candidates.sort(key=lambda x: (x.get("nextMs") is None, x.get("nextMs") or 0))
+
+    index = (by_timer, by_activates)
+    with TIMERS_INDEX_LOCK:
+        TIMERS_INDEX["source"] = timers
+        TIMERS_INDEX["index"] = index
+    return index
+
+
 def schedule_for_unit(unit):
-    if not unit or len(unit) > 200 or not UNIT_RE.fullmatch(unit):
-        raise ValueError("invalid unit")
+    validate_unit(unit)
 
-    timers = list_timers()
-    by_timer = {t.get("timer"): t for t in timers if t.get("timer")}
+    by_timer, by_activates = _timers_index()
 
     if unit.endswith(".timer"):
         t = by_timer.get(unit)
@@ -165,8 +329,7 @@ def schedule_for_unit(unit):
         }
 
     if unit.endswith(".service"):
-        candidates = [t for t in timers if t.get("activates") == unit]
-        candidates.sort(key=lambda x: (x.get("nextMs") is None, x.get("nextMs") or 0))
+        candidates = by_activates.get(unit)
         t = candidates[0] if candidates else None
         return {
             "unit": unit,
@@ -186,113 +349,207 @@ def resolve_log_unit(unit):
     if unit.endswith(".timer"):
         s = schedule_for_unit(unit)
         a = s.get("activates")
-        if a and isinstance(a, str) and UNIT_RE.fullmatch(a):
+        if isinstance(a, str) and UNIT_RE.match(a):
             return a
     return unit
 
 
-def list_runs(unit, limit=10):
-    if not unit or len(unit) > 200 or not UNIT_RE.fullmatch(unit):
-        raise ValueError("invalid unit")
-    if limit < 1 or limit > 50:
-        raise ValueError("invalid limit")
+def upd_status(prev, msg):
+    if not msg or not isinstance(msg, str):
+        return prev
+    status = None
+    for m in STATUS_RE.finditer(msg):
+        status = m.lastgroup
+        if status == "failed":
+            return "failed"
+    if status is None:
+        return prev
+    return prev if prev == "failed" else "success"
 
-    log_unit = resolve_log_unit(unit)
 
-    scan = run([
+def runs_state(log_unit):
+    with RUNS_CACHE_LOCK:
+        state = RUNS_CACHE.get(log_unit)
+        if state is None:
+            state = RUNS_CACHE[log_unit] = {"lock": threading.Lock(), "cursor": None, "agg": {}}
+            while len(RUNS_CACHE) > RUNS_CACHE_UNITS:
+                RUNS_CACHE.popitem(last=False)
+        else:
+            RUNS_CACHE.move_to_end(log_unit)
+        return state
+
+
+def scan_runs(log_unit, state):
+    cmd = [
         "journalctl",
         f"--unit={log_unit}",
-        "-n",
-        "20000",
         "--no-pager",
         "-o",
-        "json",
-    ], timeout=14)
-
-    inv_ids = []
-    inv_set = set()
-    for line in scan.splitlines():
-        if not line:
+        "json-seq",
+    ]
+    if state["cursor"]:
+        cmd.append(f"--after-cursor={state['cursor']}")
+    else:
+        cmd += ["-n", "20000"]
+
+    agg = state["agg"]
+    last = None
+    for rec in run_records(cmd, timeout=14):
+        last = rec
+        m = JOURNAL_INVOCATION_RE.search(rec)
+        if not m:
             continue
         try:
-            e = json.loads(line)
+            e = json_loads(rec)
         except Exception:
             continue
-        inv = e.get("INVOCATION_ID")
-        if not inv or not INVOCATION_RE.fullmatch(inv):
-            continue
-        if inv in inv_set:
+        ts_ms = usec_to_ms(e.get("__REALTIME_TIMESTAMP"))
+        if ts_ms is None:
             continue
-        inv_set.add(inv)
-        inv_ids.append(inv)
-        if len(inv_ids) >= limit:
-            break
-
-    def upd_status(prev, msg):
-        m = (msg or "").lower()
-        if "failed" in m or "error" in m or "exited" in m:
-            return "failed"
-        if "deactivated successfully" in m or m.startswith("finished "):
-            return prev if prev == "failed" else "success"
-        return prev
+        inv = m.group(1).decode("ascii")
+        d = agg.get(inv)
+        if d is None:
+            d = agg[inv] = {"start": ts_ms, "end": ts_ms, "cpu": None, "status": "unknown"}
+        elif ts_ms < d["start"]:
+            d["start"] = ts_ms
+        elif ts_ms > d["end"]:
+            d["end"] = ts_ms
+
+        cpu = e.get("CPU_USAGE_NSEC")
+        if cpu is not None:
+            try:
+                d["cpu"] = max(d["cpu"] or 0, int(cpu))
+            except Exception:
+                pass
 
-    runs = []
-    for inv in inv_ids:
-        raw = run([
-            "journalctl",
-            f"--unit={log_unit}",
-            f"INVOCATION_ID={inv}",
+        d["status"] = upd_status(d["status"], e.get("MESSAGE"))
+
+    if last is not None:
+        m = JOURNAL_CURSOR_RE.search(last)
+        if m:
+            state["cursor"] = m.group(1).decode("utf-8")
+
+    while len(agg) > RUNS_KEEP:
+        del agg[next(iter(agg))]
+
+
+def show_timestamp_to_ms(v):
+    parts = (v or "").split()
+    if len(parts) != 4 or parts[3] != "UTC":
+        return None
+    try:
+        dt = datetime.strptime(f"{parts[1]} {parts[2]}", "%Y-%m-%d %H:%M:%S.%f")
+    except ValueError:
+        return None
+    return (dt.replace(tzinfo=timezone.utc) - EPOCH) // timedelta(milliseconds=1)
+
+
+def last_run_from_show(log_unit):
+    try:
+        out = run([
+            "systemctl",
+            "show",
             "--no-pager",
-            "-o",
-            "json",
-        ], timeout=10)
+            "--timestamp=us+utc",
+            "-p",
+            "InvocationID,ExecMainStartTimestamp,ExecMainExitTimestamp,Result,CPUUsageNSec",
+            "--",
+            log_unit,
+        ], timeout=6)
+    except RuntimeError:
+        return None
+    props = {}
+    for line in out.splitlines():
+        if "=" not in line:
+            continue
+        k, v = line.split("=", 1)
+        props[k] = v
 
-        start_ms = None
+    inv = props.get("InvocationID", "")
+    start_ms = show_timestamp_to_ms(props.get("ExecMainStartTimestamp"))
+    if not INVOCATION_RE.match(inv) or start_ms is None:
+        return None
+
+    end_ms = show_timestamp_to_ms(props.get("ExecMainExitTimestamp"))
+    if end_ms is not None and end_ms < start_ms:
         end_ms = None
+
+    if end_ms is None:
         status = "unknown"
-        cpu_usage = None
+    elif props.get("Result") == "success":
+        status = "success"
+    else:
+        status = "failed"
 
-        for line in raw.splitlines():
-            if not line:
-                continue
-            try:
-                e = json.loads(line)
-            except Exception:
-                continue
-            ts_ms = usec_to_ms(e.get("__REALTIME_TIMESTAMP"))
-            if ts_ms is not None:
-                start_ms = ts_ms if start_ms is None else min(start_ms, ts_ms)
-                end_ms = ts_ms if end_ms is None else max(end_ms, ts_ms)
+    try:
+        cpu = int(props.get("CPUUsageNSec", ""))
+    except ValueError:
+        cpu = None
+    if cpu is not None and cpu >= 2**64 - 1:
+        cpu = None
+
+    return {
+        "invocationId": inv,
+        "startMs": start_ms,
+        "startIso": ms_to_iso(start_ms),
+        "endMs": end_ms,
+        "endIso": ms_to_iso(end_ms),
+        "durationMs": (end_ms - start_ms) if end_ms is not None else None,
+        "status": status,
+        "cpuUsageNsec": cpu,
+    }
 
-            cpu = e.get("CPU_USAGE_NSEC")
+
+def list_runs(unit, limit=10):
+    validate_unit(unit)
+    if limit < 1 or limit > RUNS_KEEP:
+        raise ValueError("invalid limit")
+
+    log_unit = resolve_log_unit(unit)
+    if limit == 1:
+        last = last_run_from_show(log_unit)
+        if last is not None:
+            return {"logUnit": log_unit, "runs": [last]}
+
+    state = runs_state(log_unit)
+
+    runs = []
+    with state["lock"]:
+        try:
+            scan_runs(log_unit, state)
+        except Exception as e:
+            resumed = state["cursor"] is not None
+            state["cursor"] = None
+            state["agg"] = {}
+            if not resumed or not isinstance(e, RuntimeError):
+                raise
             try:
-                cpu_n = int(cpu) if cpu is not None else None
+                scan_runs(log_unit, state)
             except Exception:
-                cpu_n = None
-            if cpu_n is not None:
-                cpu_usage = cpu_n if cpu_usage is None else max(cpu_usage, cpu_n)
-
-            status = upd_status(status, e.get("MESSAGE"))
-
-        duration_ms = (end_ms - start_ms) if (start_ms is not None and end_ms is not None) else None
-        runs.append({
-            "invocationId": inv,
-            "startMs": start_ms,
-            "startIso": ms_to_iso(start_ms),
-            "endMs": end_ms,
-            "endIso": ms_to_iso(end_ms),
-            "durationMs": duration_ms,
-            "status": status,
-            "cpuUsageNsec": cpu_usage,
-        })
+                state["agg"] = {}
+                state["cursor"] = None
+                raise
+
+        agg = state["agg"]
+        for inv in list(agg)[-limit:]:
+            d = agg[inv]
+            runs.append({
+                "invocationId": inv,
+                "startMs": d["start"],
+                "startIso": ms_to_iso(d["start"]),
+                "endMs": d["end"],
+                "endIso": ms_to_iso(d["end"]),
+                "durationMs": d["end"] - d["start"],
+                "status": d["status"],
+                "cpuUsageNsec": d["cpu"],
+            })
 
     return {"logUnit": log_unit, "runs": runs}
 
 
 def logs_for_invocation(unit, invocation_id, limit=400):
-    if not unit or len(unit) > 200 or not UNIT_RE.fullmatch(unit):
-        raise ValueError("invalid unit")
-    if not invocation_id or not INVOCATION_RE.fullmatch(invocation_id):
+    validate_unit(unit)
+    if not INVOCATION_RE.match(invocation_id):
         raise ValueError("invalid invocation")
     if limit < 1 or limit > 5000:
         raise ValueError("invalid limit")
@@ -316,11 +573,13 @@ def units_for_targets(targets):
     if not targets:
         return list_units()
 
-    wanted = set()
-    for t in targets:
-        if not t or len(t) > 200 or not UNIT_RE.fullmatch(t) or not t.endswith(".target"):
-            continue
-        deps = run([
+    valid = [
+        t for t in dict.fromkeys(targets)
+        if UNIT_RE.match(t) and t.endswith(".target")
+    ]
+
+    def deps_for(t):
+        return run([
             "systemctl",
             "list-dependencies",
             "--all",
@@ -330,14 +589,20 @@ def units_for_targets(targets):
             "--",
             t,
         ], timeout=10)
-        wanted.add(t)
-        for line in deps.splitlines():
-            s = line.lstrip(" \t●○*├└│─")
-            if not s:
-                continue
-            u = s.split(None, 1)[0]
-            if UNIT_RE.fullmatch(u):
-                wanted.add(u)
+
+    wanted = set()
+    if valid:
+        with ThreadPoolExecutor(max_workers=min(8, len(valid))) as ex:
+            results = list(ex.map(deps_for, valid))
+        for t, deps in zip(valid, results):
+            wanted.add(t)
+            for line in deps.splitlines():
+                s = line.lstrip(" \t●○*├└│─")
+                if not s:
+                    continue
+                u = s.split(None, 1)[0]
+                if UNIT_RE.match(u):
+                    wanted.add(u)
 
     if not wanted:
         return list_units()
@@ -346,66 +611,131 @@ def units_for_targets(targets):
     return [u for u in items if u.get("unit") in wanted]
 
 
-def unit_detail(unit):
-    if not unit or len(unit) > 200 or not UNIT_RE.fullmatch(unit):
-        raise ValueError("invalid unit")
+UNIT_DETAIL_PROPS = (
+    "Id",
+    "Description",
+    "LoadState",
+    "ActiveState",
+    "SubState",
+    "UnitFileState",
+    "FragmentPath",
+    "DropInPaths",
+    "Documentation",
+    "After",
+    "Requires",
+    "Wants",
+)
+
 
-    props_out = run([
+def show_units(units):
+    out = run([
         "systemctl",
         "show",
         "--no-pager",
         "-p",
-        "Id",
-        "-p",
-        "Description",
-        "-p",
-        "LoadState",
-        "-p",
-        "ActiveState",
-        "-p",
-        "SubState",
-        "-p",
-        "UnitFileState",
-        "-p",
-        "FragmentPath",
-        "-p",
-        "DropInPaths",
-        "-p",
-        "Documentation",
-        "-p",
-        "After",
-        "-p",
-        "Requires",
-        "-p",
-        "Wants",
+        ",".join(UNIT_DETAIL_PROPS),
         "--",
-        unit,
+        *units,
     ], timeout=6)
 
-    props = {}
-    for line in props_out.splitlines():
-        if "=" not in line:
-            continue
-        k, v = line.split("=", 1)
-        props[k] = v
+    blocks = []
+    for block in out.strip("\n").split("\n\n"):
+        props = {}
+        for line in block.splitlines():
+            if "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            props[k] = v
+        blocks.append(props)
+    if len(blocks) != len(units):
+        raise RuntimeError("unexpected systemctl show output")
+    return dict(zip(units, blocks))
+
+
+class _ShowBatch:
+    def __init__(self):
+        self.units = []
+        self.done = threading.Event()
+        self.result = {}
+        self.error = None
+
+
+class ShowBatcher:
+    def __init__(self, window=0.01):
+        self.window = window
+        self.lock = threading.Lock()
+        self.batch = None
+
+    def show(self, unit):
+        with self.lock:
+            batch = self.batch
+            leader = batch is None
+            if leader:
+                batch = self.batch = _ShowBatch()
+            if unit not in batch.units:
+                batch.units.append(unit)
+
+        if leader:
+            time.sleep(self.window)
+            with self.lock:
+                self.batch = None
+            try:
+                batch.result = show_units(batch.units)
+            except Exception as e:
+                batch.error = e
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            if len(batch.units) == 1:
+                raise batch.error
+            return show_units([unit])[unit]
+        return batch.result[unit]
+
+
+SHOW_BATCHER = ShowBatcher()
 
+
+def unit_detail(unit):
+    validate_unit(unit)
+
+    props = SHOW_BATCHER.show(unit)
     cat_out = run(["systemctl", "cat", "--no-pager", "--", unit], timeout=6)
     return {"unit": unit, "properties": props, "cat": cat_out}
 
 
 class Handler(BaseHTTPRequestHandler):
     server_version = "systemd-ui/0"
+    protocol_version = "HTTP/1.1"
+    timeout = 30
 
     def log_message(self, format, *args):
         return
 
+    def accepts_gzip(self):
+        return "gzip" in (self.headers.get("Accept-Encoding") or "").lower()
+
     def send_json(self, status, payload):
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        body = json_dumps(payload)
+        encoding = ""
+        if len(body) >= GZIP_MIN_BYTES and self.accepts_gzip():
+            body = gzip.compress(body, compresslevel=1)
+            encoding = "Content-Encoding: gzip\r\n"
+        self.log_request(status)
+        head = (
+            f"{self.protocol_version} {status.value} {status.phrase}\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"{encoding}"
+            "Vary: Accept-Encoding\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if self.close_connection else 'keep-alive'}\r\n"
+            "\r\n"
+        )
+        self.wfile.write(head.encode("latin-1") + body)
 
     def send_text(self, status, text, content_type="text/plain; charset=utf-8"):
         body = text.encode("utf-8")
@@ -517,22 +847,87 @@ class Handler(BaseHTTPRequestHandler):
             return
 
         file_path = os.path.join(PUBLIC_DIR, safe)
-        if not os.path.isfile(file_path):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.send_text(HTTPStatus.NOT_FOUND, "not found")
+            return
+        if not stat.S_ISREG(st.st_mode):
             self.send_text(HTTPStatus.NOT_FOUND, "not found")
             return
 
-        ctype, _ = mimetypes.guess_type(file_path)
-        if not ctype:
-            ctype = "application/octet-stream"
+        with STATIC_CACHE_LOCK:
+            hit = STATIC_CACHE.get(file_path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            ctype, data = hit[2], hit[3]
+            fd = None
+        else:
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except OSError:
+                self.send_text(HTTPStatus.NOT_FOUND, "not found")
+                return
+            st = os.fstat(fd)
+            if not stat.S_ISREG(st.st_mode):
+                os.close(fd)
+                self.send_text(HTTPStatus.NOT_FOUND, "not found")
+                return
+            ctype = content_type_for(os.path.splitext(file_path)[1])
+            data = None
 
-        with open(file_path, "rb") as f:
-            data = f.read()
+        try:
+            self.send_static(file_path, st, ctype, data, fd)
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def send_static(self, file_path, st, ctype, data, fd):
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+        if self.not_modified(etag, st.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.end_headers()
+            return
 
         self.send_response(HTTPStatus.OK)
         self.send_header("Content-Type", ctype)
-        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Content-Length", str(st.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
         self.end_headers()
-        self.wfile.write(data)
+
+        if data is not None:
+            self.wfile.write(data)
+            return
+
+        with open(fd, "rb", closefd=False) as f:
+            self.connection.sendfile(f, 0, st.st_size)
+
+        if st.st_size <= STATIC_CACHE_MAX_BYTES:
+            data = os.pread(fd, st.st_size, 0)
+            with STATIC_CACHE_LOCK:
+                STATIC_CACHE[file_path] = (st.st_mtime_ns, st.st_size, ctype, data)
+
+    def not_modified(self, etag, mtime):
+        inm = self.headers.get("If-None-Match")
+        if inm:
+            tags = [t.strip() for t in inm.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+        ims = self.headers.get("If-Modified-Since")
+        if ims:
+            try:
+                since = email.utils.parsedate_to_datetime(ims)
+            except (TypeError, ValueError):
+                return False
+            if since is None:
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return int(mtime) <= since.timestamp()
+        return False
 
 
 def main():